@@ -0,0 +1,105 @@
+# static seed data for the rustyheads database
+
+FACE_NAMES = (
+    'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight',
+    'Nine', 'Ten', 'Jack', 'Queen', 'King', 'Ace',
+)
+
+SUIT_NAMES = ('Diamonds', 'Hearts', 'Spades', 'Clubs')
+
+
+def card_id(face, suit):
+    # cards are numbered face by face within each suit
+    return len(FACE_NAMES) * (suit - 1) + face
+
+
+CARDS = [
+    (card_id(face, suit), face, suit)
+    for suit in range(1, len(SUIT_NAMES) + 1)
+    for face in range(1, len(FACE_NAMES) + 1)
+]
+
+DECK_TYPES = [
+    ('Tournament', 'Standard card deck, 20 different cards'),
+    ('WithNines', 'Tournament deck expanded by nines, 24 different cards'),
+]
+
+MATCH_TYPES = [
+    ('Normal', 'Normal game with no special rules', 0),
+    ('JackSolo', 'The caller plays alone, Jacks are trump', 1),
+    ('QueenSolo', 'The caller plays alone, Queens are trump', 1),
+]
+
+EYES_PER_FACE = [
+    (1,  9, 10),
+    (1, 10,  2),
+    (1, 11,  3),
+    (1, 12,  4),
+    (1, 13, 11),
+
+    (2,  8,  0),
+    (2,  9, 10),
+    (2, 10,  2),
+    (2, 11,  3),
+    (2, 12,  4),
+    (2, 13, 11),
+]
+
+# Ten, Jack, Queen, King and Ace of each suit
+TOURNAMENT_FACES = range(9, 14)
+
+CARDS_PER_DECK = [
+    (1, card_id(face, suit))
+    for suit in range(1, len(SUIT_NAMES) + 1)
+    for face in TOURNAMENT_FACES
+]
+
+CARDS_PER_RULE = [
+    (1,  1, 10, 1),  # Ten of Diamonds
+    (1,  2, 12, 1),  # Jack of Diamonds
+    (1,  3, 16, 1),  # Queen of Diamonds
+    (1,  4, 20, 1),  # King of Diamonds
+    (1,  5, 11, 1),  # Ace of Diamonds
+
+    (1,  6,  4, 0),  # Ten of Hearts
+    (1,  7, 13, 1),  # Jack of Hearts
+    (1,  8, 17, 1),  # Queen of Hearts
+    (1,  9,  1, 0),  # King of Hearts
+    (1, 10,  7, 0),  # Ace of Hearts
+
+    (1, 11,  5, 0),  # Ten of Spades
+    (1, 12, 14, 1),  # Jack of Spades
+    (1, 13, 18, 1),  # Queen of Spades
+    (1, 14,  2, 0),  # King of Spades
+    (1, 15,  8, 0),  # Ace of Spades
+
+    (1, 16,  6, 0),  # Ten of Clubs
+    (1, 17, 15, 1),  # Jack of Clubs
+    (1, 18, 19, 1),  # Queen of Clubs
+    (1, 19,  3, 0),  # King of Clubs
+    (1, 20,  9, 0),  # Ace of Clubs
+
+    (2,  1,  9, 0),
+    (2,  2, 17, 1),
+    (2,  3,  1, 1),
+    (2,  4,  5, 0),
+    (2,  5, 13, 0),
+
+    (2,  6, 10, 0),
+    (2,  7, 18, 1),
+    (2,  8,  2, 1),
+    (2,  9,  6, 0),
+    (2, 10, 14, 0),
+
+    (2, 11, 11, 0),
+    (2, 12, 19, 1),
+    (2, 13,  3, 1),
+    (2, 14,  7, 0),
+    (2, 15, 15, 0),
+
+    (2, 16, 12, 0),
+    (2, 17, 20, 1),
+    (2, 18,  4, 1),
+    (2, 19,  8, 0),
+    (2, 20, 16, 0),
+]
@@ -1215,6 +1215,9 @@ pub mod game {
         // filepath for db
         const DB_FILE: &str = "./db/rustyheads.db";
 
+        // size of the memory map used to read the db, large enough for the whole file
+        const DB_MMAP_SIZE: i64 = 256 * 1024 * 1024;
+
         // enum deck types
         #[derive(PartialEq, Eq, PartialOrd, Ord, Clone, Copy, Hash)]
         pub enum DeckType {
@@ -1289,33 +1292,47 @@ pub mod game {
             }
         }
 
-        pub fn get_deck_for_decktype(deck_type: DeckType) -> Option<Vec<Card>> {
-            // Connect to an SQLite database in memory or a file
+        // open the db, mmap_size is not stored in the db file and has to be set per connection
+        fn open_db() -> Connection {
             let conn = Connection::open(DB_FILE).unwrap();
+            conn.pragma_update_and_check(None, "mmap_size", DB_MMAP_SIZE, |_| Ok(()))
+                .unwrap();
+            conn
+        }
+
+        thread_local! {
+            // keep one connection per thread open instead of reopening the db for every query
+            static DB_CONN: Connection = open_db();
+        }
 
+        pub fn get_deck_for_decktype(deck_type: DeckType) -> Option<Vec<Card>> {
             // sort the cards based on the deck type
             // query db for cards in normal game
-            let mut stmt = conn
-                .prepare(
-                    "
-                        SELECT c.suit, c.face 
-                          FROM cards AS c
-                          JOIN cards_per_deck AS cpd ON c.id = cpd.card_id
-                         WHERE cpd.deck_type = ?1
-                            ",
-                )
-                .unwrap();
+            let mut cards = DB_CONN.with(|conn| {
+                let mut stmt = conn
+                    .prepare_cached(
+                        "
+                            SELECT c.suit, c.face 
+                              FROM cards AS c
+                              JOIN cards_per_deck AS cpd ON c.id = cpd.card_id
+                             WHERE cpd.deck_type = ?1
+                                ",
+                    )
+                    .unwrap();
 
-            let card_iter = stmt.query_map(params![deck_type], |row| {
-                Ok(Card::new(row.get(0)?, row.get(1)?, 0, false, 0))
-            });
+                let card_iter = stmt.query_map(params![deck_type], |row| {
+                    Ok(Card::new(row.get(0)?, row.get(1)?, 0, false, 0))
+                });
 
-            let mut cards = Vec::new();
-            for card in card_iter.unwrap() {
-                let card = card.unwrap();
-                cards.push(card);
-                cards.push(card.clone());
-            }
+                let mut cards = Vec::new();
+                for card in card_iter.unwrap() {
+                    let card = card.unwrap();
+                    cards.push(card);
+                    cards.push(card.clone());
+                }
+
+                cards
+            });
 
             cards.sort();
 
@@ -1333,42 +1350,44 @@ pub mod game {
             match_type: MatchType,
             deck_type: DeckType,
         ) -> Option<Vec<Card>> {
-            // Connect to an SQLite database in memory or a file
-            let conn = Connection::open(DB_FILE).unwrap();
-
             // sort the cards based on the match type
             // query db for cards in normal game
-            let mut stmt = conn
-                .prepare(
-                    "
-                        SELECT c.suit, c.face, ey.eyes, cpr.trump, cpr.rank
-                          FROM cards AS c
-                          JOIN cards_per_deck AS cpd ON c.id = cpd.card_id
-                          JOIN cards_per_rule AS cpr ON cpd.id = cpr.cpd_id
-                          JOIN eyes_per_face AS ey ON c.face = ey.face
-                           AND ey.deck_type = cpd.deck_type
-                         WHERE cpd.deck_type = ?1
-                           AND cpr.match_type = ?2
-                            ",
-                )
-                .unwrap();
+            let mut cards = DB_CONN.with(|conn| {
+                let mut stmt = conn
+                    .prepare_cached(
+                        "
+                            SELECT c.suit, c.face, ey.eyes,
+                                   cpr.rank_trump & 1, cpr.rank_trump >> 1
+                              FROM cards AS c
+                              JOIN cards_per_deck AS cpd ON c.id = cpd.card_id
+                              JOIN cards_per_rule AS cpr ON cpd.id = cpr.cpd_id
+                              JOIN eyes_per_face AS ey ON c.face = ey.face
+                               AND ey.deck_type = cpd.deck_type
+                             WHERE cpd.deck_type = ?1
+                               AND cpr.match_type = ?2
+                                ",
+                    )
+                    .unwrap();
+
+                let card_iter = stmt.query_map(params![match_type, deck_type], |row| {
+                    Ok(Card::new(
+                        row.get(0)?,
+                        row.get(1)?,
+                        row.get(2)?,
+                        row.get(3)?,
+                        row.get(4)?,
+                    ))
+                });
 
-            let card_iter = stmt.query_map(params![match_type, deck_type], |row| {
-                Ok(Card::new(
-                    row.get(0)?,
-                    row.get(1)?,
-                    row.get(2)?,
-                    row.get(3)?,
-                    row.get(4)?,
-                ))
-            });
+                let mut cards = Vec::new();
+                for card in card_iter.unwrap() {
+                    let card = card.unwrap();
+                    cards.push(card);
+                    cards.push(card.clone());
+                }
 
-            let mut cards = Vec::new();
-            for card in card_iter.unwrap() {
-                let card = card.unwrap();
-                cards.push(card);
-                cards.push(card.clone());
-            }
+                cards
+            });
 
             cards.sort();
 